@@ -14,81 +14,217 @@ Usage:
 """
 
 import argparse
+import contextlib
+import gzip
+import hashlib
+import json
 import os
-import nbformat as nbf
-from pathlib import Path
-
-
-def create_aws_credentials_notebook():
-    """Create AWS credentials test notebook."""
-    nb = nbf.v4.new_notebook()
-    
-    nb['cells'] = [
-        nbf.v4.new_markdown_cell("# AWS Credentials Test\n\nThis notebook tests AWS credential injection via External Secrets Operator (ESO)."),
-        
-        nbf.v4.new_code_cell(
-            "# Import libraries\n"
-            "import os\n"
-            "import boto3\n"
-            "from botocore.exceptions import ClientError"
-        ),
-        
-        nbf.v4.new_code_cell(
-            "# Verify credentials are injected\n"
-            "assert 'AWS_ACCESS_KEY_ID' in os.environ, \"AWS_ACCESS_KEY_ID not found\"\n"
-            "assert 'AWS_SECRET_ACCESS_KEY' in os.environ, \"AWS_SECRET_ACCESS_KEY not found\"\n"
-            "assert 'AWS_REGION' in os.environ, \"AWS_REGION not found\"\n"
-            "print(\"✓ All AWS credentials found\")"
-        ),
-        
-        nbf.v4.new_code_cell(
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:  # fall back to nbformat's serializer
+    orjson = None
+
+
+# Notebook metadata shared by every generated notebook. The kernelspec lets
+# papermill pick a kernel without a -k override. Notebooks reference this
+# dict rather than copies of it, so it must not be mutated.
+_NB_METADATA = {
+    "kernelspec": {"display_name": "Python 3", "language": "python", "name": "python3"},
+    "language_info": {"name": "python"},
+}
+
+# Notebooks and cells are plain nbformat v4.5 dicts built directly rather
+# than through nbformat's constructors; nbformat is only imported to
+# validate and serialize notebooks that are actually built. Ids are derived
+# from the cell's position, so they are unique within a notebook and stable
+# across runs. Sources are stored as lists of lines, as nbformat writes
+# them, so diffs of the generated notebooks show only the lines that changed.
+def _md(source, cell_id):
+    return {"cell_type": "markdown", "id": cell_id, "metadata": {},
+            "source": source.splitlines(keepends=True)}
+
+
+def _code(source, cell_id):
+    return {"cell_type": "code", "id": cell_id, "metadata": {},
+            "source": source.splitlines(keepends=True),
+            "execution_count": None, "outputs": []}
+
+
+# Fragments shared by many cells, defined once so every cell references the
+# same string object.
+IMPORT_OS = "# Import libraries\nimport os"
+SUMMARY_HEADER = 'print("\\n=== {title} Summary ===")'
+
+
+def _imports(*lines):
+    """Return an imports cell source that starts with IMPORT_OS."""
+    return "\n".join((IMPORT_OS,) + lines)
+
+
+def _summary(title, *lines):
+    """Return a closing summary cell source with the standard header."""
+    return "\n".join(("# Summary", SUMMARY_HEADER.format(title=title)) + lines)
+
+
+_ESO_ASSERT_TEMPLATE = (
+    "# Verify credentials are injected\n"
+    "missing = [var for var in {env_vars!r} if var not in os.environ]\n"
+    "assert not missing, f\"{{', '.join(missing)}} not found\"\n"
+    "print(\"✓ All {label} credentials found\")"
+)
+
+
+def _eso_assert_block(label, env_vars):
+    """Return the credential-assertion cell source shared by the ESO notebooks."""
+    return _ESO_ASSERT_TEMPLATE.format(label=label, env_vars=list(env_vars))
+
+
+# Long cell sources kept as standalone files next to this script.
+_TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+
+
+def _read_template(name):
+    """Return a cell source template without its trailing newline."""
+    with open(os.path.join(_TEMPLATES_DIR, name), encoding='utf-8') as f:
+        return f.read().rstrip('\n')
+
+
+_DEPLOY_SRC = _read_template('deploy_inferenceservice.py.tmpl')
+
+
+# Long markdown cells of the model-training notebook, one item per line.
+_TRAINING_INTRO_MD = (
+    "# Train Sentiment Analysis Model",
+    "",
+    "This notebook demonstrates a complete ML workflow:",
+    "1. Load and prepare training data",
+    "2. Train a sentiment analysis model",
+    "3. Evaluate model performance",
+    "4. Save model for deployment",
+    "5. (Optional) Deploy to KServe/OpenShift AI",
+)
+
+_DEPLOY_MD = (
+    "## Step 7: Deploy Model (Optional)",
+    "",
+    "Deploy the trained model to KServe/OpenShift AI for serving.",
+    "",
+    "**Note:** This step requires:",
+    "- Model files uploaded to S3 or persistent storage",
+    "- Kubernetes/OpenShift cluster with KServe installed",
+    "- Appropriate RBAC permissions",
+)
+
+_TRAINING_SUMMARY_MD = (
+    "## Summary",
+    "",
+    "✅ Training data created (20 samples)",
+    "✅ Model trained (Logistic Regression)",
+    "✅ Model evaluated (accuracy reported)",
+    "✅ Model saved to disk",
+    "✅ Saved model tested",
+    "✅ Model deployment (optional, if DEPLOY_MODEL=true)",
+    "✅ Deployed model testing (optional)",
+    "",
+    "### Complete End-to-End Workflow",
+    "",
+    "This notebook demonstrates a complete ML workflow:",
+    "1. **Data Preparation** - Create/load training data",
+    "2. **Feature Engineering** - TF-IDF vectorization",
+    "3. **Model Training** - Train classifier",
+    "4. **Model Evaluation** - Validate performance",
+    "5. **Model Persistence** - Save model artifacts",
+    "6. **Model Testing** - Verify saved model works",
+    "7. **Model Deployment** - Deploy to KServe/OpenShift AI (optional)",
+    "8. **Inference Testing** - Test deployed model (optional)",
+    "",
+    "### Environment Variables for Deployment",
+    "",
+    "To enable automatic deployment, set:",
+    "- `DEPLOY_MODEL=true` - Enable deployment",
+    "- `NAMESPACE=mlops` - Target namespace",
+    "- `MODEL_NAME=trained-sentiment-model` - Model name",
+    "- `MODEL_STORAGE_URI=pvc://model-storage/sentiment-model` - Storage location",
+    "",
+    "### Manual Deployment",
+    "",
+    "If automatic deployment is disabled, deploy manually:",
+    "",
+    "```bash",
+    "# 1. Extract model from pod",
+    "POD=$(oc get pods -n mlops -l job-name=train-sentiment-model-validation -o jsonpath='{.items[0].metadata.name}')",
+    "oc cp mlops/$POD:/tmp/sentiment-model ./trained-model/",
+    "",
+    "# 2. Upload to S3",
+    "aws s3 cp ./trained-model/ s3://my-bucket/models/sentiment-v1/ --recursive",
+    "",
+    "# 3. Create InferenceService",
+    "cat <<EOF | oc apply -f -",
+    "apiVersion: serving.kserve.io/v1beta1",
+    "kind: InferenceService",
+    "metadata:",
+    "  name: trained-sentiment-model",
+    "  namespace: mlops",
+    "spec:",
+    "  predictor:",
+    "    model:",
+    "      modelFormat:",
+    "        name: sklearn",
+    "        version: '1'",
+    "      runtime: mlserver-sklearn",
+    "      storageUri: s3://my-bucket/models/sentiment-v1/",
+    "EOF",
+    "```",
+)
+
+# Cell specs for every generated notebook, keyed by path relative to --output-dir.
+# Each cell is a (kind, source) tuple where kind is 'md' or 'code'.
+NOTEBOOK_SPECS = {
+    'eso-integration/aws-credentials-test.ipynb': [
+        ('md', "# AWS Credentials Test\n\nThis notebook tests AWS credential injection via External Secrets Operator (ESO)."),
+
+        ('code', _imports(
+            "import boto3",
+            "from botocore.exceptions import ClientError",
+        )),
+
+        ('code', _eso_assert_block('AWS', ['AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY', 'AWS_REGION'])),
+
+        ('code',
             "# Test credential format\n"
             "access_key = os.environ['AWS_ACCESS_KEY_ID']\n"
             "assert access_key.startswith('AKIA'), f\"Invalid AWS access key format: {access_key[:4]}...\"\n"
             "print(f\"✓ AWS Access Key format valid: {access_key[:4]}...\")"
         ),
-        
-        nbf.v4.new_code_cell(
+
+        ('code',
             "# Test region\n"
             "region = os.environ['AWS_REGION']\n"
             "assert region in ['us-east-1', 'us-west-2', 'eu-west-1'], f\"Unexpected region: {region}\"\n"
             "print(f\"✓ AWS Region: {region}\")"
         ),
-        
-        nbf.v4.new_code_cell(
-            "# Summary\n"
-            "print(\"\\n=== AWS Credentials Test Summary ===\")\n"
-            "print(\"✓ All AWS credentials properly injected\")\n"
-            "print(\"✓ Credential format validation passed\")\n"
-            "print(\"✓ Region validation passed\")"
-        ),
-    ]
-    
-    return nb
-
-
-def create_database_connection_notebook():
-    """Create database connection test notebook."""
-    nb = nbf.v4.new_notebook()
-    
-    nb['cells'] = [
-        nbf.v4.new_markdown_cell("# Database Connection Test\n\nThis notebook tests database credential injection via ESO."),
-        
-        nbf.v4.new_code_cell(
-            "# Import libraries\n"
-            "import os\n"
-            "from urllib.parse import quote_plus"
-        ),
-        
-        nbf.v4.new_code_cell(
-            "# Verify credentials are injected\n"
-            "required_vars = ['DB_HOST', 'DB_PORT', 'DB_NAME', 'DB_USER', 'DB_PASSWORD']\n"
-            "for var in required_vars:\n"
-            "    assert var in os.environ, f\"{var} not found\"\n"
-            "print(\"✓ All database credentials found\")"
-        ),
-        
-        nbf.v4.new_code_cell(
+
+        ('code', _summary(
+            'AWS Credentials Test',
+            'print("✓ All AWS credentials properly injected")',
+            'print("✓ Credential format validation passed")',
+            'print("✓ Region validation passed")',
+        )),
+    ],
+
+    'eso-integration/database-connection-test.ipynb': [
+        ('md', "# Database Connection Test\n\nThis notebook tests database credential injection via ESO."),
+
+        ('code', _imports(
+            "from urllib.parse import quote_plus",
+        )),
+
+        ('code', _eso_assert_block('database', ['DB_HOST', 'DB_PORT', 'DB_NAME', 'DB_USER', 'DB_PASSWORD'])),
+
+        ('code',
             "# Build connection string\n"
             "db_host = os.environ['DB_HOST']\n"
             "db_port = os.environ['DB_PORT']\n"
@@ -98,90 +234,62 @@ def create_database_connection_notebook():
             "connection_string = f\"postgresql://{db_user}:{quote_plus(db_password)}@{db_host}:{db_port}/{db_name}\"\n"
             "print(f\"✓ Connection string built: postgresql://{db_user}:***@{db_host}:{db_port}/{db_name}\")"
         ),
-        
-        nbf.v4.new_code_cell(
+
+        ('code',
             "# Test connection (mock - don't actually connect in test)\n"
             "print(\"✓ Database credentials validated (connection test skipped in validation)\")"
         ),
-        
-        nbf.v4.new_code_cell(
-            "# Summary\n"
-            "print(\"\\n=== Database Credentials Test Summary ===\")\n"
-            "print(\"✓ All database credentials properly injected\")\n"
-            "print(\"✓ Connection string format valid\")"
-        ),
-    ]
-    
-    return nb
-
-
-def create_mlflow_tracking_notebook():
-    """Create MLflow tracking test notebook."""
-    nb = nbf.v4.new_notebook()
-    
-    nb['cells'] = [
-        nbf.v4.new_markdown_cell("# MLflow Tracking Test\n\nThis notebook tests MLflow credential injection via ESO."),
-        
-        nbf.v4.new_code_cell(
-            "# Import libraries\n"
-            "import os"
-        ),
-        
-        nbf.v4.new_code_cell(
-            "# Verify credentials are injected\n"
-            "assert 'MLFLOW_TRACKING_URI' in os.environ, \"MLFLOW_TRACKING_URI not found\"\n"
-            "assert 'MLFLOW_TRACKING_USERNAME' in os.environ, \"MLFLOW_TRACKING_USERNAME not found\"\n"
-            "assert 'MLFLOW_TRACKING_PASSWORD' in os.environ, \"MLFLOW_TRACKING_PASSWORD not found\"\n"
-            "print(\"✓ All MLflow credentials found\")"
-        ),
-        
-        nbf.v4.new_code_cell(
+
+        ('code', _summary(
+            'Database Credentials Test',
+            'print("✓ All database credentials properly injected")',
+            'print("✓ Connection string format valid")',
+        )),
+    ],
+
+    'eso-integration/mlflow-tracking-test.ipynb': [
+        ('md', "# MLflow Tracking Test\n\nThis notebook tests MLflow credential injection via ESO."),
+
+        ('code', IMPORT_OS),
+
+        ('code', _eso_assert_block('MLflow', ['MLFLOW_TRACKING_URI', 'MLFLOW_TRACKING_USERNAME', 'MLFLOW_TRACKING_PASSWORD'])),
+
+        ('code',
             "# Set MLflow tracking URI\n"
             "tracking_uri = os.environ['MLFLOW_TRACKING_URI']\n"
             "print(f\"✓ MLflow tracking URI: {tracking_uri}\")"
         ),
-        
-        nbf.v4.new_code_cell(
+
+        ('code',
             "# Test authentication (mock)\n"
             "username = os.environ['MLFLOW_TRACKING_USERNAME']\n"
             "print(f\"✓ MLflow username: {username}\")"
         ),
-        
-        nbf.v4.new_code_cell(
-            "# Summary\n"
-            "print(\"\\n=== MLflow Credentials Test Summary ===\")\n"
-            "print(\"✓ All MLflow credentials properly injected\")\n"
-            "print(\"✓ Tracking URI configured\")"
-        ),
-    ]
-    
-    return nb
-
-
-def create_kserve_inference_notebook():
-    """Create KServe model inference test notebook."""
-    nb = nbf.v4.new_notebook()
-    
-    nb['cells'] = [
-        nbf.v4.new_markdown_cell("# KServe Model Inference Test\n\nThis notebook tests model inference against KServe InferenceService."),
-        
-        nbf.v4.new_code_cell(
-            "# Import libraries\n"
-            "import os\n"
-            "import requests\n"
-            "import json\n"
-            "import numpy as np"
-        ),
-        
-        nbf.v4.new_code_cell(
+
+        ('code', _summary(
+            'MLflow Credentials Test',
+            'print("✓ All MLflow credentials properly injected")',
+            'print("✓ Tracking URI configured")',
+        )),
+    ],
+
+    'model-validation/kserve/model-inference-kserve.ipynb': [
+        ('md', "# KServe Model Inference Test\n\nThis notebook tests model inference against KServe InferenceService."),
+
+        ('code', _imports(
+            "import requests",
+            "import json",
+        )),
+
+        ('code',
             "# Verify model environment variables\n"
             "model_endpoint = os.environ.get('MODEL_ENDPOINT', 'http://fraud-detection-model.mlops.svc.cluster.local')\n"
             "model_name = os.environ.get('MODEL_NAME', 'fraud-detection-model')\n"
             "print(f\"✓ Model endpoint: {model_endpoint}\")\n"
             "print(f\"✓ Model name: {model_name}\")"
         ),
-        
-        nbf.v4.new_code_cell(
+
+        ('code',
             "# Test model health check\n"
             "health_url = f\"{model_endpoint}/v1/models/{model_name}\"\n"
             "try:\n"
@@ -193,8 +301,8 @@ def create_kserve_inference_notebook():
             "except requests.exceptions.RequestException as e:\n"
             "    print(f\"⚠ Health check skipped (model not deployed): {e}\")"
         ),
-        
-        nbf.v4.new_code_cell(
+
+        ('code',
             "# Prepare test data\n"
             "test_data = {\n"
             "    \"instances\": [\n"
@@ -203,8 +311,8 @@ def create_kserve_inference_notebook():
             "}\n"
             "print(f\"✓ Test data prepared: {test_data}\")"
         ),
-        
-        nbf.v4.new_code_cell(
+
+        ('code',
             "# Make prediction (mock if model not available)\n"
             "predict_url = f\"{model_endpoint}/v1/models/{model_name}:predict\"\n"
             "try:\n"
@@ -217,40 +325,30 @@ def create_kserve_inference_notebook():
             "except requests.exceptions.RequestException as e:\n"
             "    print(f\"⚠ Prediction skipped (model not deployed): {e}\")"
         ),
-        
-        nbf.v4.new_code_cell(
-            "# Summary\n"
-            "print(\"\\n=== KServe Model Inference Test Summary ===\")\n"
-            "print(\"✓ Model endpoint configured\")\n"
-            "print(\"✓ Test data prepared\")\n"
-            "print(\"✓ Inference test completed\")"
-        ),
-    ]
-    
-    return nb
-
-
-def create_openshift_ai_notebook():
-    """Create OpenShift AI sentiment analysis test notebook."""
-    nb = nbf.v4.new_notebook()
-    
-    nb['cells'] = [
-        nbf.v4.new_markdown_cell("# OpenShift AI Sentiment Analysis Test\n\nThis notebook tests sentiment analysis model on OpenShift AI."),
-        
-        nbf.v4.new_code_cell(
-            "# Import libraries\n"
-            "import os\n"
-            "import requests\n"
-            "import json"
-        ),
-        
-        nbf.v4.new_code_cell(
+
+        ('code', _summary(
+            'KServe Model Inference Test',
+            'print("✓ Model endpoint configured")',
+            'print("✓ Test data prepared")',
+            'print("✓ Inference test completed")',
+        )),
+    ],
+
+    'model-validation/openshift-ai/sentiment-analysis-test.ipynb': [
+        ('md', "# OpenShift AI Sentiment Analysis Test\n\nThis notebook tests sentiment analysis model on OpenShift AI."),
+
+        ('code', _imports(
+            "import requests",
+            "import json",
+        )),
+
+        ('code',
             "# Verify OpenShift AI environment\n"
             "model_endpoint = os.environ.get('MODEL_ENDPOINT', 'http://sentiment-analysis-model.mlops.svc.cluster.local')\n"
             "print(f\"✓ OpenShift AI model endpoint: {model_endpoint}\")"
         ),
-        
-        nbf.v4.new_code_cell(
+
+        ('code',
             "# Prepare sentiment analysis test data\n"
             "test_texts = [\n"
             "    \"This is a great product!\",\n"
@@ -259,8 +357,8 @@ def create_openshift_ai_notebook():
             "]\n"
             "print(f\"✓ Test texts prepared: {len(test_texts)} samples\")"
         ),
-        
-        nbf.v4.new_code_cell(
+
+        ('code',
             "# Test sentiment analysis (mock if model not available)\n"
             "for i, text in enumerate(test_texts):\n"
             "    print(f\"\\nTest {i+1}: {text}\")\n"
@@ -278,49 +376,31 @@ def create_openshift_ai_notebook():
             "    except requests.exceptions.RequestException as e:\n"
             "        print(f\"  ⚠ Prediction skipped: {e}\")"
         ),
-        
-        nbf.v4.new_code_cell(
-            "# Summary\n"
-            "print(\"\\n=== Sentiment Analysis Test Summary ===\")\n"
-            "print(\"✓ OpenShift AI endpoint configured\")\n"
-            "print(f\"✓ Tested {len(test_texts)} samples\")"
-        ),
-    ]
-    
-    return nb
-
-
-def create_model_training_notebook():
-    """Create a notebook that trains a sentiment analysis model from scratch."""
-    nb = nbf.v4.new_notebook()
-
-    nb['cells'] = [
-        nbf.v4.new_markdown_cell(
-            "# Train Sentiment Analysis Model\n\n"
-            "This notebook demonstrates a complete ML workflow:\n"
-            "1. Load and prepare training data\n"
-            "2. Train a sentiment analysis model\n"
-            "3. Evaluate model performance\n"
-            "4. Save model for deployment\n"
-            "5. (Optional) Deploy to KServe/OpenShift AI"
-        ),
 
-        nbf.v4.new_code_cell(
-            "# Import libraries\n"
-            "import os\n"
-            "import numpy as np\n"
-            "import pandas as pd\n"
-            "from sklearn.feature_extraction.text import TfidfVectorizer\n"
-            "from sklearn.linear_model import LogisticRegression\n"
-            "from sklearn.model_selection import train_test_split\n"
-            "from sklearn.metrics import accuracy_score, classification_report\n"
-            "import joblib\n"
-            "import json"
-        ),
+        ('code', _summary(
+            'Sentiment Analysis Test',
+            'print("✓ OpenShift AI endpoint configured")',
+            'print(f"✓ Tested {len(test_texts)} samples")',
+        )),
+    ],
+
+    'model-training/train-sentiment-model.ipynb': [
+        ('md', "\n".join(_TRAINING_INTRO_MD)),
 
-        nbf.v4.new_markdown_cell("## Step 1: Create Training Data"),
+        ('code', _imports(
+            "import numpy as np",
+            "import pandas as pd",
+            "from sklearn.feature_extraction.text import TfidfVectorizer",
+            "from sklearn.linear_model import LogisticRegression",
+            "from sklearn.model_selection import train_test_split",
+            "from sklearn.metrics import accuracy_score, classification_report",
+            "import joblib",
+            "import json",
+        )),
 
-        nbf.v4.new_code_cell(
+        ('md', "## Step 1: Create Training Data"),
+
+        ('code',
             "# Create sample sentiment analysis dataset\n"
             "# In production, you would load this from S3, database, etc.\n"
             "training_data = [\n"
@@ -356,9 +436,9 @@ def create_model_training_notebook():
             "print(f\"  Negative: {(df['sentiment'] == 0).sum()}\")"
         ),
 
-        nbf.v4.new_markdown_cell("## Step 2: Prepare Data"),
+        ('md', "## Step 2: Prepare Data"),
 
-        nbf.v4.new_code_cell(
+        ('code',
             "# Split into train and test sets\n"
             "X_train, X_test, y_train, y_test = train_test_split(\n"
             "    df['text'], df['sentiment'], test_size=0.2, random_state=42\n"
@@ -369,7 +449,7 @@ def create_model_training_notebook():
             "print(f\"  Test samples: {len(X_test)}\")"
         ),
 
-        nbf.v4.new_code_cell(
+        ('code',
             "# Create TF-IDF vectorizer\n"
             "vectorizer = TfidfVectorizer(max_features=100, ngram_range=(1, 2))\n"
             "X_train_vec = vectorizer.fit_transform(X_train)\n"
@@ -379,9 +459,9 @@ def create_model_training_notebook():
             "print(f\"  Feature dimensions: {X_train_vec.shape[1]}\")"
         ),
 
-        nbf.v4.new_markdown_cell("## Step 3: Train Model"),
+        ('md', "## Step 3: Train Model"),
 
-        nbf.v4.new_code_cell(
+        ('code',
             "# Train logistic regression model\n"
             "model = LogisticRegression(random_state=42, max_iter=1000)\n"
             "model.fit(X_train_vec, y_train)\n"
@@ -389,9 +469,9 @@ def create_model_training_notebook():
             "print(\"✓ Model trained successfully\")"
         ),
 
-        nbf.v4.new_markdown_cell("## Step 4: Evaluate Model"),
+        ('md', "## Step 4: Evaluate Model"),
 
-        nbf.v4.new_code_cell(
+        ('code',
             "# Make predictions\n"
             "y_pred = model.predict(X_test_vec)\n"
             "\n"
@@ -404,7 +484,7 @@ def create_model_training_notebook():
             "print(classification_report(y_test, y_pred, target_names=['Negative', 'Positive']))"
         ),
 
-        nbf.v4.new_code_cell(
+        ('code',
             "# Test with sample predictions\n"
             "test_texts = [\n"
             "    'This is amazing!',\n"
@@ -423,9 +503,9 @@ def create_model_training_notebook():
             "    print(f\"    → {sentiment} (confidence: {confidence:.2%})\")"
         ),
 
-        nbf.v4.new_markdown_cell("## Step 5: Save Model"),
+        ('md', "## Step 5: Save Model"),
 
-        nbf.v4.new_code_cell(
+        ('code',
             "# Create model directory\n"
             "model_dir = '/tmp/sentiment-model'\n"
             "os.makedirs(model_dir, exist_ok=True)\n"
@@ -452,12 +532,12 @@ def create_model_training_notebook():
             "print(f\"  - metadata.json\")"
         ),
 
-        nbf.v4.new_markdown_cell(
+        ('md',
             "## Step 6: Test Saved Model\n\n"
             "Verify the saved model can be loaded and used for predictions."
         ),
 
-        nbf.v4.new_code_cell(
+        ('code',
             "# Load saved model\n"
             "loaded_model = joblib.load(f'{model_dir}/model.pkl')\n"
             "loaded_vectorizer = joblib.load(f'{model_dir}/vectorizer.pkl')\n"
@@ -474,16 +554,9 @@ def create_model_training_notebook():
             "print(f\"  Confidence: {prob[pred]:.2%}\")"
         ),
 
-        nbf.v4.new_markdown_cell(
-            "## Step 7: Deploy Model (Optional)\n\n"
-            "Deploy the trained model to KServe/OpenShift AI for serving.\n\n"
-            "**Note:** This step requires:\n"
-            "- Model files uploaded to S3 or persistent storage\n"
-            "- Kubernetes/OpenShift cluster with KServe installed\n"
-            "- Appropriate RBAC permissions"
-        ),
+        ('md', "\n".join(_DEPLOY_MD)),
 
-        nbf.v4.new_code_cell(
+        ('code',
             "# Check if we're running in Kubernetes\n"
             "import os\n"
             "from pathlib import Path\n"
@@ -500,104 +573,14 @@ def create_model_training_notebook():
             "    print(\"\\n⚠ Skipping deployment (set DEPLOY_MODEL=true to enable)\")"
         ),
 
-        nbf.v4.new_code_cell(
-            "# Deploy model to KServe/OpenShift AI\n"
-            "if in_kubernetes and deploy_enabled:\n"
-            "    try:\n"
-            "        from kubernetes import client, config\n"
-            "        import yaml\n"
-            "        \n"
-            "        # Load in-cluster config\n"
-            "        config.load_incluster_config()\n"
-            "        \n"
-            "        # Get namespace\n"
-            "        namespace = os.environ.get('NAMESPACE', 'mlops')\n"
-            "        model_name = os.environ.get('MODEL_NAME', 'trained-sentiment-model')\n"
-            "        storage_uri = os.environ.get('MODEL_STORAGE_URI', 'pvc://model-storage/sentiment-model')\n"
-            "        \n"
-            "        # Create InferenceService manifest\n"
-            "        inference_service = {\n"
-            "            'apiVersion': 'serving.kserve.io/v1beta1',\n"
-            "            'kind': 'InferenceService',\n"
-            "            'metadata': {\n"
-            "                'name': model_name,\n"
-            "                'namespace': namespace,\n"
-            "                'annotations': {\n"
-            "                    'serving.kserve.io/deploymentMode': 'Serverless'\n"
-            "                },\n"
-            "                'labels': {\n"
-            "                    'trained-by': 'jupyter-notebook-validator',\n"
-            "                    'model-type': 'sklearn',\n"
-            "                    'training-notebook': 'train-sentiment-model'\n"
-            "                }\n"
-            "            },\n"
-            "            'spec': {\n"
-            "                'predictor': {\n"
-            "                    'model': {\n"
-            "                        'modelFormat': {\n"
-            "                            'name': 'sklearn',\n"
-            "                            'version': '1'\n"
-            "                        },\n"
-            "                        'runtime': 'mlserver-sklearn',\n"
-            "                        'storageUri': storage_uri,\n"
-            "                        'resources': {\n"
-            "                            'requests': {\n"
-            "                                'cpu': '100m',\n"
-            "                                'memory': '256Mi'\n"
-            "                            },\n"
-            "                            'limits': {\n"
-            "                                'cpu': '500m',\n"
-            "                                'memory': '512Mi'\n"
-            "                            }\n"
-            "                        }\n"
-            "                    }\n"
-            "                }\n"
-            "            }\n"
-            "        }\n"
-            "        \n"
-            "        # Create custom object API\n"
-            "        api = client.CustomObjectsApi()\n"
-            "        \n"
-            "        # Deploy InferenceService\n"
-            "        try:\n"
-            "            api.create_namespaced_custom_object(\n"
-            "                group='serving.kserve.io',\n"
-            "                version='v1beta1',\n"
-            "                namespace=namespace,\n"
-            "                plural='inferenceservices',\n"
-            "                body=inference_service\n"
-            "            )\n"
-            "            print(f\"✓ InferenceService '{model_name}' created in namespace '{namespace}'\")\n"
-            "        except client.exceptions.ApiException as e:\n"
-            "            if e.status == 409:\n"
-            "                print(f\"⚠ InferenceService '{model_name}' already exists\")\n"
-            "            else:\n"
-            "                raise\n"
-            "        \n"
-            "        print(f\"\\nDeployment details:\")\n"
-            "        print(f\"  Model name: {model_name}\")\n"
-            "        print(f\"  Namespace: {namespace}\")\n"
-            "        print(f\"  Storage URI: {storage_uri}\")\n"
-            "        print(f\"\\nWait for model to be ready:\")\n"
-            "        print(f\"  oc wait --for=condition=Ready inferenceservice/{model_name} -n {namespace} --timeout=5m\")\n"
-            "        \n"
-            "    except Exception as e:\n"
-            "        print(f\"✗ Deployment failed: {e}\")\n"
-            "        print(\"\\nTo deploy manually, save the model to S3/PVC and create InferenceService:\")\n"
-            "        print(yaml.dump(inference_service, default_flow_style=False))\n"
-            "else:\n"
-            "    print(\"Skipping deployment. To deploy manually:\")\n"
-            "    print(\"\\n1. Upload model files to S3 or PVC\")\n"
-            "    print(\"2. Create InferenceService with storageUri pointing to model location\")\n"
-            "    print(\"3. Wait for model to be Ready\")"
-        ),
+        ('code', _DEPLOY_SRC),
 
-        nbf.v4.new_markdown_cell(
+        ('md',
             "## Step 8: Test Deployed Model (Optional)\n\n"
             "Use the model discovery library to find and test the deployed model."
         ),
 
-        nbf.v4.new_code_cell(
+        ('code',
             "# Test deployed model using model discovery\n"
             "if in_kubernetes and deploy_enabled:\n"
             "    try:\n"
@@ -663,98 +646,242 @@ def create_model_training_notebook():
             "    print(\"Skipping deployed model testing\")"
         ),
 
-        nbf.v4.new_markdown_cell(
-            "## Summary\n\n"
-            "✅ Training data created (20 samples)\n"
-            "✅ Model trained (Logistic Regression)\n"
-            "✅ Model evaluated (accuracy reported)\n"
-            "✅ Model saved to disk\n"
-            "✅ Saved model tested\n"
-            "✅ Model deployment (optional, if DEPLOY_MODEL=true)\n"
-            "✅ Deployed model testing (optional)\n\n"
-            "### Complete End-to-End Workflow\n\n"
-            "This notebook demonstrates a complete ML workflow:\n"
-            "1. **Data Preparation** - Create/load training data\n"
-            "2. **Feature Engineering** - TF-IDF vectorization\n"
-            "3. **Model Training** - Train classifier\n"
-            "4. **Model Evaluation** - Validate performance\n"
-            "5. **Model Persistence** - Save model artifacts\n"
-            "6. **Model Testing** - Verify saved model works\n"
-            "7. **Model Deployment** - Deploy to KServe/OpenShift AI (optional)\n"
-            "8. **Inference Testing** - Test deployed model (optional)\n\n"
-            "### Environment Variables for Deployment\n\n"
-            "To enable automatic deployment, set:\n"
-            "- `DEPLOY_MODEL=true` - Enable deployment\n"
-            "- `NAMESPACE=mlops` - Target namespace\n"
-            "- `MODEL_NAME=trained-sentiment-model` - Model name\n"
-            "- `MODEL_STORAGE_URI=pvc://model-storage/sentiment-model` - Storage location\n\n"
-            "### Manual Deployment\n\n"
-            "If automatic deployment is disabled, deploy manually:\n\n"
-            "```bash\n"
-            "# 1. Extract model from pod\n"
-            "POD=$(oc get pods -n mlops -l job-name=train-sentiment-model-validation -o jsonpath='{.items[0].metadata.name}')\n"
-            "oc cp mlops/$POD:/tmp/sentiment-model ./trained-model/\n\n"
-            "# 2. Upload to S3\n"
-            "aws s3 cp ./trained-model/ s3://my-bucket/models/sentiment-v1/ --recursive\n\n"
-            "# 3. Create InferenceService\n"
-            "cat <<EOF | oc apply -f -\n"
-            "apiVersion: serving.kserve.io/v1beta1\n"
-            "kind: InferenceService\n"
-            "metadata:\n"
-            "  name: trained-sentiment-model\n"
-            "  namespace: mlops\n"
-            "spec:\n"
-            "  predictor:\n"
-            "    model:\n"
-            "      modelFormat:\n"
-            "        name: sklearn\n"
-            "        version: '1'\n"
-            "      runtime: mlserver-sklearn\n"
-            "      storageUri: s3://my-bucket/models/sentiment-v1/\n"
-            "EOF\n"
-            "```"
-        ),
-    ]
+        ('md', "\n".join(_TRAINING_SUMMARY_MD)),
+    ],
+}
+
+
+def _build_cell(index, kind, source):
+    """Build the cell at position index of a notebook."""
+    return (_md if kind == 'md' else _code)(source, f"cell-{index}")
+
+
+def build_notebook(spec):
+    """Build a notebook from a list of (kind, source) cell specs."""
+    # The cell count is known up front, so size the list once instead of
+    # growing it cell by cell.
+    cells = [None] * len(spec)
+    for index, (kind, source) in enumerate(spec):
+        cells[index] = _build_cell(index, kind, source)
+    return {"cells": cells, "metadata": _NB_METADATA, "nbformat": 4, "nbformat_minor": 5}
+
+
+# Notebooks are a few KB each, so one buffer holds a whole notebook.
+WRITE_BUFFER_SIZE = 256 * 1024
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS | orjson.OPT_APPEND_NEWLINE
+
+
+@contextlib.contextmanager
+def _atomic_open(path, mode, **kwargs):
+    """Open a temporary file that replaces path only once the block succeeds.
+
+    A crash mid-write leaves the previous notebook intact instead of a
+    truncated one.
+    """
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, mode, **kwargs) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+
+def validate_notebook(nb):
+    """Validate a notebook dict against the nbformat schema.
+
+    Raises nbformat.ValidationError if the notebook is invalid.
+    """
+    import nbformat as nbf
+
+    nbf.validate(nbf.from_dict(nb))
+
 
-    return nb
+def _nbformat_bytes(nb):
+    """Return a notebook dict as validated and formatted by nbformat.
+
+    nbformat.writes() only logs schema errors, so the notebook is validated
+    explicitly first and a ValidationError is raised for invalid notebooks.
+    """
+    import nbformat as nbf
+
+    node = nbf.from_dict(nb)
+    nbf.validate(node)
+    text = nbf.writes(node)
+    if not text.endswith('\n'):
+        text += '\n'
+    return text.encode('utf-8')
+
+
+def encode_notebook(spec, strict=False):
+    """Build, validate and encode the notebook for spec, returning its bytes.
+
+    By default the notebook is validated and then encoded with orjson. With
+    strict=True, or when orjson is not installed, nbformat serializes it
+    instead, producing nbformat's canonical formatting. Real writes and
+    --dry-run both go through here, so a dry run reports the same sizes and
+    rejects the same invalid notebooks as a real run.
+    """
+    nb = build_notebook(spec)
+    if strict or orjson is None:
+        return _nbformat_bytes(nb)
+    validate_notebook(nb)
+    return orjson.dumps(nb, option=_ORJSON_OPTIONS)
+
+
+def _gzip_writer(f):
+    """Wrap f in a fast gzip stream with a reproducible header."""
+    return gzip.GzipFile(filename='', mode='wb', fileobj=f, compresslevel=1, mtime=0)
+
+
+def _write_bytes(output_path, data, compress):
+    """Atomically write an encoded notebook, gzip-compressed if asked."""
+    with _atomic_open(output_path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+        with _gzip_writer(f) if compress else contextlib.nullcontext(f) as out:
+            out.write(data)
+
+
+# Per-output-dir record of the spec digest, size and mtime of each notebook
+# last written, so unchanged notebooks are not rebuilt or rewritten.
+CACHE_FILE = '.nbgen-cache.json'
+
+# Seeding digests with this script's mtime invalidates the cache on any edit.
+_CACHE_SEED = repr(os.path.getmtime(__file__)).encode()
+
+
+def _spec_digest(path, spec, strict, compress):
+    """Return the cache digest for a notebook spec and writer options."""
+    h = hashlib.sha256(_CACHE_SEED)
+    h.update(repr((path, spec, strict, compress)).encode())
+    return h.hexdigest()
+
+
+def _load_cache(cache_path):
+    """Load the notebook cache, treating a missing or corrupt file as empty."""
+    try:
+        with open(cache_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _is_cached(entry, digest, output_path):
+    """Check whether output_path was written from digest and not modified since."""
+    if not entry or entry.get('digest') != digest:
+        return False
+    try:
+        st = os.stat(output_path)
+    except OSError:
+        return False
+    return st.st_size == entry.get('size') and st.st_mtime == entry.get('mtime')
+
+
+def _content_digest(chunks):
+    """Return a short BLAKE2b digest of a notebook's encoded chunks."""
+    h = hashlib.blake2b(digest_size=16)
+    for chunk in chunks:
+        h.update(chunk)
+    return h.digest()
+
+
+def _file_digest(path, compress):
+    """Return the content digest of an existing notebook file, or None.
+
+    A missing or unreadable file (including a corrupt .gz) yields None, so
+    the notebook is simply rewritten.
+    """
+    try:
+        with (gzip.open(path, 'rb') if compress else open(path, 'rb')) as f:
+            return _content_digest(iter(lambda: f.read(WRITE_BUFFER_SIZE), b''))
+    except (OSError, EOFError, zlib.error):
+        return None
+
+
+def _write_one(item):
+    """Write one encoded notebook; runs in a worker thread.
+
+    The write is skipped when the file already holds identical content, so
+    a cache miss alone does not touch the file. Returns whether the file
+    was written, plus its size and mtime.
+    """
+    data, output_path, compress = item
+    existing = _file_digest(output_path, compress)
+    written = existing is None or existing != _content_digest((data,))
+    if written:
+        _write_bytes(output_path, data, compress)
+    st = os.stat(output_path)
+    return written, st.st_size, st.st_mtime
 
 
 def main():
     parser = argparse.ArgumentParser(description='Generate test notebooks for integration testing')
     parser.add_argument('--output-dir', type=str, required=True,
                         help='Output directory (path to jupyter-notebook-validator-test-notebooks repo)')
+    parser.add_argument('--strict', action='store_true',
+                        help="Serialize notebooks with nbformat's writer instead of orjson")
+    parser.add_argument('--gzip', action='store_true',
+                        help='Write gzip-compressed .ipynb.gz files (e.g. for CI artifacts)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Build, validate and encode every notebook in memory and report its size without writing')
     args = parser.parse_args()
-    
-    output_dir = Path(args.output_dir)
-    
-    # Create directory structure
-    (output_dir / 'eso-integration').mkdir(parents=True, exist_ok=True)
-    (output_dir / 'model-validation' / 'kserve').mkdir(parents=True, exist_ok=True)
-    (output_dir / 'model-validation' / 'openshift-ai').mkdir(parents=True, exist_ok=True)
-    (output_dir / 'model-training').mkdir(parents=True, exist_ok=True)
-
-    # Generate notebooks
-    notebooks = {
-        'eso-integration/aws-credentials-test.ipynb': create_aws_credentials_notebook(),
-        'eso-integration/database-connection-test.ipynb': create_database_connection_notebook(),
-        'eso-integration/mlflow-tracking-test.ipynb': create_mlflow_tracking_notebook(),
-        'model-validation/kserve/model-inference-kserve.ipynb': create_kserve_inference_notebook(),
-        'model-validation/openshift-ai/sentiment-analysis-test.ipynb': create_openshift_ai_notebook(),
-        'model-training/train-sentiment-model.ipynb': create_model_training_notebook(),
-    }
-    
-    for path, notebook in notebooks.items():
-        output_path = output_dir / path
-        with open(output_path, 'w') as f:
-            nbf.write(notebook, f)
-        print(f"✓ Created: {output_path}")
-    
-    print(f"\n✓ Successfully generated {len(notebooks)} test notebooks in {output_dir}")
+
+    if args.dry_run:
+        for path, spec in NOTEBOOK_SPECS.items():
+            size = len(encode_notebook(spec, strict=args.strict))
+            print(f"✓ Built: {path} ({size} bytes)")
+        print(f"\n✓ Dry run: built {len(NOTEBOOK_SPECS)} test notebooks, nothing written")
+        return
+
+    output_dir = os.path.normpath(args.output_dir)
+    suffix = '.gz' if args.gzip else ''
+    output_paths = {path: os.path.join(output_dir, path + suffix) for path in NOTEBOOK_SPECS}
+
+    # Create directory structure, once per distinct notebook directory
+    for parent in {os.path.dirname(output_path) for output_path in output_paths.values()}:
+        os.makedirs(parent, exist_ok=True)
+
+    # Generate notebooks, skipping any whose spec and output file are unchanged
+    cache_path = os.path.join(output_dir, CACHE_FILE)
+    cache = _load_cache(cache_path)
+
+    stale = []
+    for path, spec in NOTEBOOK_SPECS.items():
+        output_path = output_paths[path]
+        digest = _spec_digest(path, spec, args.strict, args.gzip)
+        if _is_cached(cache.get(path), digest, output_path):
+            print(f"✓ Unchanged: {output_path}")
+        else:
+            stale.append((path, digest, spec, output_path))
+
+    if stale:
+        # Encode and validate in the main thread: the nbformat import and
+        # schema compilation are not worth racing across workers. Only the
+        # file comparisons and writes run in parallel.
+        items = [(encode_notebook(spec, strict=args.strict), output_path, args.gzip)
+                 for _, _, spec, output_path in stale]
+        with ThreadPoolExecutor(max_workers=len(items)) as ex:
+            results = list(ex.map(_write_one, items))
+        for (path, digest, _, output_path), (written, size, mtime) in zip(stale, results):
+            cache[path] = {'digest': digest, 'size': size, 'mtime': mtime}
+            print(f"✓ Created: {output_path}" if written else f"≈ Unchanged: {output_path}")
+
+    with open(cache_path, 'w') as f:
+        json.dump(cache, f, indent=2)
+
+    print(f"\n✓ Successfully generated {len(NOTEBOOK_SPECS)} test notebooks in {output_dir}")
     print("\nNext steps:")
     print("1. cd to the jupyter-notebook-validator-test-notebooks directory")
     print("2. Review the generated notebooks")
-    print("3. git add . && git commit -m 'Add integration test notebooks'")
+    # Only stage the notebook directories: the cache holds this machine's
+    # file mtimes and never matches on another checkout.
+    notebook_dirs = ' '.join(sorted({path.split('/', 1)[0] for path in NOTEBOOK_SPECS}))
+    print(f"3. git add {notebook_dirs} && git commit -m 'Add integration test notebooks'")
     print("4. git push origin main")
+    print(f"\nNote: {CACHE_FILE} is a local build cache; add it to .gitignore instead of committing it.")
 
 
 if __name__ == '__main__':